@@ -13,6 +13,25 @@ guesses to process.
 '''
 
 import sys
+import math
+import time
+import random
+import asyncio
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # the density solver falls back to plain loops
+    np = None
+
+
+WIDTH = 10
+HEIGHT = 10
+FLEET_SIZES = [("A", 5), ("B", 4), ("S", 3), ("D", 3), ("P", 2)]
+
+# boards with more cells than this use SparseGame in new_game()
+DENSE_CELLS = 1 << 18
 
 
 class GridPos:
@@ -37,6 +56,76 @@ class Ship:
         return self.kind
 
 
+class PlacementError:
+    """Why a fleet could not be placed; message() is the CLI's text."""
+
+    def __init__(self, reason, line=None):
+        self.reason = reason
+        self.line = line
+
+    def message(self):
+        if self.line is None:
+            return "ERROR: " + self.reason
+        return "ERROR: " + self.reason + ": " + self.line
+
+    def __str__(self):
+        return self.message()
+
+
+def plan_ship(kind, x1, y1, x2, y2, line="", width=WIDTH, height=HEIGHT,
+              fleet=FLEET_SIZES):
+    """Check a placement and return (size, list of (x, y) cells).
+
+    Returns a PlacementError instead for a ship that is out of bounds of
+    a width x height board, diagonal, or the wrong size for its kind in
+    fleet (a list of (kind, size) pairs).
+    """
+    if x1 < 0 or x1 >= width or x2 < 0 or x2 >= width or \
+            y1 < 0 or y1 >= height or y2 < 0 or y2 >= height:
+        return PlacementError("ship out-of-bounds", line)
+
+    if not (x1 == x2 or y1 == y2):
+        return PlacementError("ship not horizontal or vertical", line)
+
+    correct_size = dict(fleet).get(kind, 0)
+    if abs(x2 - x1) + abs(y2 - y1) + 1 != correct_size:
+        return PlacementError("incorrect ship size", line)
+
+    coords = []
+
+    if x1 == x2:
+        low = y1
+        high = y2
+        if y2 < y1:
+            low = y2
+            high = y1
+        y = low
+        while y <= high:
+            coords.append((x1, y))
+            y += 1
+    else:
+        low = x1
+        high = x2
+        if x2 < x1:
+            low = x2
+            high = x1
+        x = low
+        while x <= high:
+            coords.append((x, y1))
+            x += 1
+
+    return correct_size, coords
+
+
+def ship_coords(kind, x1, y1, x2, y2, line):
+    """plan_ship() for the printing boards: report an error and exit."""
+    planned = plan_ship(kind, x1, y1, x2, y2, line)
+    if isinstance(planned, PlacementError):
+        print(planned.message())
+        sys.exit(0)
+    return planned
+
+
 class Board:
     def __init__(self):
         self.grid = []
@@ -53,53 +142,7 @@ class Board:
         self.ships = {}
 
     def place_ship(self, kind, x1, y1, x2, y2, line):
-
-        if x1 < 0 or x1 > 9 or x2 < 0 or x2 > 9 or y1 < 0 or y1 > 9 or y2 < 0 or y2 > 9:
-            print("ERROR: ship out-of-bounds: " + line)
-            sys.exit(0)
-
-        if not (x1 == x2 or y1 == y2):
-            print("ERROR: ship not horizontal or vertical: " + line)
-            sys.exit(0)
-
-        correct_size = 0
-        if kind == "A":
-            correct_size = 5
-        elif kind == "B":
-            correct_size = 4
-        elif kind == "S":
-            correct_size = 3
-        elif kind == "D":
-            correct_size = 3
-        elif kind == "P":
-            correct_size = 2
-
-        coords = []
-
-        if x1 == x2:
-            low = y1
-            high = y2
-            if y2 < y1:
-                low = y2
-                high = y1
-            y = low
-            while y <= high:
-                coords.append((x1, y))
-                y += 1
-        else:
-            low = x1
-            high = x2
-            if x2 < x1:
-                low = x2
-                high = x1
-            x = low
-            while x <= high:
-                coords.append((x, y1))
-                x += 1
-
-        if len(coords) != correct_size:
-            print("ERROR: incorrect ship size: " + line)
-            sys.exit(0)
+        correct_size, coords = ship_coords(kind, x1, y1, x2, y2, line)
 
         i = 0
         while i < len(coords):
@@ -122,109 +165,903 @@ class Board:
 
         self.ships[kind] = ship
 
-    def process_guess(self, x, y):
+    def fire(self, x, y):
+        """Apply one guess and return a GuessResult, without printing."""
 
         if x < 0 or x > 9 or y < 0 or y > 9:
-            print("illegal guess")
-            return
+            return _ILLEGAL_RESULT
 
         pos = self.grid[y][x]
 
         if pos.ship is None:
             if pos.guessed:
-                print("miss (again)")
-            else:
-                print("miss")
-                pos.guessed = True
-            return
+                return _MISS_AGAIN_RESULT
+            pos.guessed = True
+            return _MISS_RESULT
 
         ship = pos.ship
 
         if pos.guessed:
-            all_hit_before = True
-            j = 0
-            while j < len(ship.positions):
-                if not ship.positions[j].guessed:
-                    all_hit_before = False
-                j += 1
-            print("hit (again)")
-            return
+            return GuessResult(HIT_AGAIN, ship.kind)
 
         pos.guessed = True
         ship.remaining -= 1
 
         if ship.remaining == 0:
-            print(ship.kind + " sunk")
-
             all_sunk = True
             for k in self.ships:
                 if self.ships[k].remaining > 0:
                     all_sunk = False
-            if all_sunk:
-                print("all ships sunk: game over")
-                sys.exit(0)
-            return
+            return GuessResult(SUNK, ship.kind, all_sunk)
 
-        print("hit")
+        return GuessResult(HIT, ship.kind)
 
+    def process_guess(self, x, y):
+        result = self.fire(x, y)
+        for message in result.messages():
+            print(message)
+        if result.game_over and result.outcome == SUNK:
+            sys.exit(0)
 
-def main():
 
-    placement_file = input()
-    board = Board()
+MISS = "miss"
+MISS_AGAIN = "miss (again)"
+HIT = "hit"
+HIT_AGAIN = "hit (again)"
+SUNK = "sunk"
+ILLEGAL = "illegal guess"
 
-    try_file = open(placement_file, "r")
-    lines = []
-    line = try_file.readline()
-    while line != "":
-        lines.append(line.strip())
-        line = try_file.readline()
-    try_file.close()
 
-    ship_counts = {"A": 0, "B": 0, "S": 0, "D": 0, "P": 0}
+class GuessResult:
+    """Outcome of one guess: one of the constants above, the ship kind
+    that was hit or sunk (if any), and whether the game is now over.
+    Results are never changed after they are made, so engines share
+    them between guesses."""
 
-    i = 0
-    while i < len(lines):
-        parts = lines[i].split()
-        if len(parts) == 5:
-            kind = parts[0]
-            if kind in ship_counts:
-                ship_counts[kind] += 1
-        i += 1
+    def __init__(self, outcome, kind=None, game_over=False):
+        self.outcome = outcome
+        self.kind = kind
+        self.game_over = game_over
+        if outcome != SUNK:
+            self._messages = (outcome,)
+        elif game_over:
+            self._messages = (kind + " sunk", "all ships sunk: game over")
+        else:
+            self._messages = (kind + " sunk",)
+
+    def messages(self):
+        """The lines the command-line game prints for this guess."""
+        return self._messages
+
+
+# results that carry no ship are shared rather than built per guess
+_MISS_RESULT = GuessResult(MISS)
+_MISS_AGAIN_RESULT = GuessResult(MISS_AGAIN)
+_ILLEGAL_RESULT = GuessResult(ILLEGAL)
+
+
+# ship kind -> its results, made the first time any game uses the kind
+_ship_results = {}
+
+
+def ship_results(kind):
+    """The results a guess on ship kind can have, shared by every game:
+    (hit, hit again, sunk, hit again after game over, sunk: game over)."""
+    results = _ship_results.get(kind)
+    if results is None:
+        results = (GuessResult(HIT, kind), GuessResult(HIT_AGAIN, kind),
+                   GuessResult(SUNK, kind),
+                   GuessResult(HIT_AGAIN, kind, True),
+                   GuessResult(SUNK, kind, True))
+        _ship_results[kind] = results
+    return results
+
+
+class Game:
+    """One game of battleship as a library object: no printing, no exits.
+
+    The ships are kept as integer bitboards. Cell (x, y) is bit
+    y * width + x; occupied holds every ship cell, masks each ship's cells
+    and hits every ship cell hit so far, so overlap, sunk and game-over
+    checks are each a single AND and compare. shots has one byte per
+    cell fired at, so a miss touches no big integers, and owner maps
+    each ship cell to its mask and ship_results(), so fire() never
+    builds a result. add_ship()/load_fleet() return a PlacementError (or
+    None) and fire() returns a GuessResult, so one process can run any
+    number of games side by side. Boards default to 10 x 10 with the
+    assignment's fleet; width, height and fleet (a list of (kind, size)
+    pairs) change that.
+    """
+
+    def __init__(self, width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+        self.width = width
+        self.height = height
+        self.fleet = list(fleet)
+        self.occupied = 0
+        self.hits = 0
+        self.shots = bytearray(width * height)
+        self.masks = {}
+        self.owner = [None] * (width * height)
+        self.over = False
+
+    def add_ship(self, kind, x1, y1, x2, y2, line=""):
+        planned = plan_ship(kind, x1, y1, x2, y2, line, self.width,
+                            self.height, self.fleet)
+        if isinstance(planned, PlacementError):
+            return planned
+        coords = planned[1]
+
+        mask = 0
+        i = 0
+        while i < len(coords):
+            mask |= 1 << (coords[i][1] * self.width + coords[i][0])
+            i += 1
+
+        if self.occupied & mask:
+            return PlacementError("overlapping ship", line)
+
+        self.occupied |= mask
+        self.masks[kind] = mask
+        ship = (mask,) + ship_results(kind)
+        i = 0
+        while i < len(coords):
+            self.owner[coords[i][1] * self.width + coords[i][0]] = ship
+            i += 1
+        return None
 
-    for k in ship_counts:
-        if ship_counts[k] != 1:
-            print("ERROR: fleet composition incorrect")
+    def load_fleet(self, lines):
+        """Place a whole fleet from placement-file lines.
+
+        Checks the fleet composition first, then places the ships in
+        order, and returns the first PlacementError (None on success).
+        """
+        ship_counts = {}
+        for kind, size in self.fleet:
+            ship_counts[kind] = 0
+        ships = []
+        i = 0
+        while i < len(lines):
+            parts = lines[i].split()
+            if len(parts) == 5:
+                kind = parts[0]
+                if kind in ship_counts:
+                    ship_counts[kind] += 1
+            if len(parts) > 0:
+                ships.append((parts, lines[i]))
+            i += 1
+
+        for k in ship_counts:
+            if ship_counts[k] != 1:
+                return PlacementError("fleet composition incorrect")
+
+        for parts, line in ships:
+            try:
+                coords = [int(parts[1]), int(parts[2]), int(parts[3]),
+                          int(parts[4])]
+            except (IndexError, ValueError):
+                return PlacementError("malformed placement", line)
+            error = self.add_ship(parts[0], coords[0], coords[1],
+                                  coords[2], coords[3], line)
+            if error is not None:
+                return error
+        return None
+
+    def fire(self, x, y):
+
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return _ILLEGAL_RESULT
+
+        # ship: (mask, hit, hit again, sunk, hit again over, sunk over)
+        index = y * self.width + x
+        ship = self.owner[index]
+        if self.shots[index]:
+            if ship is None:
+                return _MISS_AGAIN_RESULT
+            if self.over:
+                return ship[4]
+            return ship[2]
+
+        self.shots[index] = 1
+        if ship is None:
+            return _MISS_RESULT
+
+        hits = self.hits | 1 << index
+        self.hits = hits
+        mask = ship[0]
+        if hits & mask == mask:
+            self.over = hits == self.occupied
+            if self.over:
+                return ship[5]
+            return ship[3]
+
+        return ship[1]
+
+
+def parse_guess(line):
+    """Return (x, y) from a guess-file line, or None if it is not one."""
+    parts = line.split()
+    if len(parts) != 2:
+        return None
+    return int(parts[0]), int(parts[1])
+
+
+class BitBoard(Game):
+    """Game with Board's interface: prints results and exits like Board."""
+
+    def place_ship(self, kind, x1, y1, x2, y2, line):
+        error = self.add_ship(kind, x1, y1, x2, y2, line)
+        if error is not None:
+            print(error.message())
             sys.exit(0)
 
+    def process_guess(self, x, y):
+        result = self.fire(x, y)
+        for message in result.messages():
+            print(message)
+        if result.game_over and result.outcome == SUNK:
+            sys.exit(0)
+
+
+class SparseGame(Game):
+    """Game whose memory grows with ship cells and guesses, not area.
+
+    Ship cells are kept in a dict keyed by (x, y) and guesses in a set, so
+    boards such as 100000 x 100000 cost no more than 10 x 10 ones. Each
+    ship tracks how many of its cells are still unhit.
+    """
+
+    def __init__(self, width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+        self.width = width
+        self.height = height
+        self.fleet = list(fleet)
+        self.cells = {}
+        self.guessed = set()
+        self.remaining = {}
+        self.results = {}
+        self.unsunk = 0
+        self.over = False
+
+    def add_ship(self, kind, x1, y1, x2, y2, line=""):
+        planned = plan_ship(kind, x1, y1, x2, y2, line, self.width,
+                            self.height, self.fleet)
+        if isinstance(planned, PlacementError):
+            return planned
+        size, coords = planned
+
+        for cell in coords:
+            if cell in self.cells:
+                return PlacementError("overlapping ship", line)
+
+        for cell in coords:
+            self.cells[cell] = kind
+        self.remaining[kind] = size
+        self.results[kind] = ship_results(kind)
+        self.unsunk += 1
+        return None
+
+    def fire(self, x, y):
+
+        if x < 0 or x >= self.width or y < 0 or y >= self.height:
+            return _ILLEGAL_RESULT
+
+        cell = (x, y)
+        already = cell in self.guessed
+        self.guessed.add(cell)
+
+        kind = self.cells.get(cell)
+        if kind is None:
+            if already:
+                return _MISS_AGAIN_RESULT
+            return _MISS_RESULT
+
+        results = self.results[kind]
+        if already:
+            if self.over:
+                return results[3]
+            return results[1]
+
+        self.remaining[kind] -= 1
+        if self.remaining[kind] == 0:
+            self.unsunk -= 1
+            self.over = self.unsunk == 0
+            if self.over:
+                return results[4]
+            return results[2]
+
+        return results[0]
+
+
+def new_game(width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+    """A bitboard Game for ordinary boards, a SparseGame for huge ones."""
+    if width * height > DENSE_CELLS:
+        return SparseGame(width, height, fleet)
+    return Game(width, height, fleet)
+
+
+def read_config(filename):
+    """Read a board configuration file; return (width, height, fleet).
+
+    Lines are "board WIDTH HEIGHT" and "ship KIND SIZE"; blank lines and
+    lines starting with # are skipped. Without ship lines the fleet is
+    the assignment's A/B/S/D/P fleet. Raises ValueError for a malformed
+    line, a board or ship size below one, a ship kind given twice, or a
+    ship longer than both board sides.
+    """
+    width = WIDTH
+    height = HEIGHT
+    fleet = []
+    for line in read_lines(filename):
+        parts = line.split()
+        if len(parts) == 0 or parts[0].startswith("#"):
+            continue
+        try:
+            if parts[0] == "board" and len(parts) == 3:
+                width = int(parts[1])
+                height = int(parts[2])
+                if width < 1 or height < 1:
+                    raise ValueError
+            elif parts[0] == "ship" and len(parts) == 3:
+                if parts[1] in dict(fleet) or int(parts[2]) < 1:
+                    raise ValueError
+                fleet.append((parts[1], int(parts[2])))
+            else:
+                raise ValueError
+        except ValueError:
+            raise ValueError("bad configuration line: " + line)
+    if not fleet:
+        fleet = list(FLEET_SIZES)
+    for kind, size in fleet:
+        if size > width and size > height:
+            raise ValueError("ship " + kind + " does not fit on a " +
+                             str(width) + "x" + str(height) + " board")
+    return width, height, fleet
+
+
+def benchmark_board_sizes(sizes=((10, 10), (300, 300), (1000, 1000),
+                                 (100000, 100000)), games=200, guesses=500):
+    """Print time and memory per game for several board sizes.
+
+    Each game places a random fleet and fires guesses random shots plus
+    one at every ship cell, on the engine new_game() picks for the size.
+    """
+    rng = random.Random(25)
+    for width, height in sizes:
+        tracemalloc.start()
+        start = time.perf_counter()
+        g = 0
+        while g < games:
+            game = new_game(width, height)
+            fleet = random_fleet(rng, width, height)
+            game.load_fleet(fleet)
+            i = 0
+            while i < guesses:
+                game.fire(rng.randrange(width), rng.randrange(height))
+                i += 1
+            for line in fleet:
+                parts = line.split()
+                planned = plan_ship(parts[0], int(parts[1]), int(parts[2]),
+                                    int(parts[3]), int(parts[4]), line,
+                                    width, height)
+                for x, y in planned[1]:
+                    game.fire(x, y)
+            g += 1
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(str(width) + "x" + str(height) + " (" +
+              type(game).__name__ + "): " +
+              str(round(1000 * elapsed / games, 3)) + " ms/game, peak " +
+              str(peak // 1024) + " KiB, over " + str(game.over))
+
+
+def benchmark_boards(games=20000):
+    """Print guesses per second for the Board and BitBoard engines.
+
+    Each game places a fixed fleet and calls fire() on all 100 cells in
+    a random order (after some repeats) until the fleet is sunk. Boards
+    are set up in untimed batches and nothing is printed, so only fire()
+    is timed.
+    """
+    fleet = [("A", 0, 0, 0, 4), ("B", 2, 2, 5, 2), ("S", 9, 9, 9, 7),
+             ("D", 4, 5, 6, 5), ("P", 7, 0, 8, 0)]
+    rng = random.Random(120)
+    cells = [(x, y) for y in range(10) for x in range(10)]
+    orders = []
     i = 0
-    while i < len(lines):
-        parts = lines[i].split()
-        kind = parts[0]
-        x1 = int(parts[1])
-        y1 = int(parts[2])
-        x2 = int(parts[3])
-        y2 = int(parts[4])
-        board.place_ship(kind, x1, y1, x2, y2, lines[i])
+    while i < 50:
+        order = cells[:]
+        rng.shuffle(order)
+        orders.append(order[:20] + order)
         i += 1
 
-    guess_file = input()
-    gf = open(guess_file, "r")
-    glines = []
-    g = gf.readline()
-    while g != "":
-        glines.append(g.strip())
-        g = gf.readline()
-    gf.close()
+    for board_class in (Board, BitBoard):
+        guesses = 0
+        elapsed = 0.0
+        g = 0
+        while g < games:
+            boards = []
+            while len(boards) < 1000 and g + len(boards) < games:
+                board = board_class()
+                for kind, x1, y1, x2, y2 in fleet:
+                    board.place_ship(kind, x1, y1, x2, y2, "")
+                boards.append(board)
 
+            start = time.perf_counter()
+            for board in boards:
+                for x, y in orders[g % len(orders)]:
+                    guesses += 1
+                    if board.fire(x, y).game_over:
+                        break
+                g += 1
+            elapsed += time.perf_counter() - start
+        print(board_class.__name__ + ": " + str(int(guesses / elapsed)) +
+              " guesses/s")
+
+
+async def _play(fleet, guesses):
+    game = Game()
+    game.load_fleet(fleet)
+    shots = 0
+    for x, y in guesses:
+        shots += 1
+        if game.fire(x, y).game_over:
+            break
+        # let the other games take a turn
+        await asyncio.sleep(0)
+    return shots
+
+
+def benchmark_concurrent(games=10000):
+    """Play games as concurrent asyncio tasks and print games/s, guesses/s."""
+    fleet = ["A 0 0 0 4", "B 2 2 5 2", "S 9 9 9 7", "D 4 5 6 5", "P 7 0 8 0"]
+    rng = random.Random(120)
+    cells = [(x, y) for y in range(10) for x in range(10)]
+    orders = []
     i = 0
-    while i < len(glines):
-        parts = glines[i].split()
-        if len(parts) == 2:
-            x = int(parts[0])
-            y = int(parts[1])
-            board.process_guess(x, y)
+    while i < 50:
+        order = cells[:]
+        rng.shuffle(order)
+        orders.append(order)
         i += 1
 
+    async def play_all():
+        tasks = []
+        g = 0
+        while g < games:
+            tasks.append(_play(fleet, orders[g % len(orders)]))
+            g += 1
+        return await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    shots = asyncio.run(play_all())
+    elapsed = time.perf_counter() - start
+    print(str(games) + " concurrent games: " + str(int(games / elapsed)) +
+          " games/s, " + str(int(sum(shots) / elapsed)) + " guesses/s")
+
+
+# Simulation of guessing strategies------------------------------
+
+def random_fleet(rng, width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+    """Return placement lines for a random legal fleet."""
+    game = new_game(width, height, fleet)
+    lines = []
+    for kind, size in fleet:
+        while True:
+            if rng.random() < 0.5:
+                x1 = rng.randrange(width - size + 1)
+                y1 = rng.randrange(height)
+                x2 = x1 + size - 1
+                y2 = y1
+            else:
+                x1 = rng.randrange(width)
+                y1 = rng.randrange(height - size + 1)
+                x2 = x1
+                y2 = y1 + size - 1
+            line = kind + " " + str(x1) + " " + str(y1) + " " + \
+                str(x2) + " " + str(y2)
+            if game.add_ship(kind, x1, y1, x2, y2, line) is None:
+                lines.append(line)
+                break
+    return lines
+
+
+class RandomStrategy:
+    """Fire at every cell once, in a random order."""
+
+    def __init__(self, rng, width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+        self.cells = [(x, y) for y in range(height) for x in range(width)]
+        rng.shuffle(self.cells)
+
+    def guess(self):
+        return self.cells.pop()
+
+    def feedback(self, x, y, result):
+        pass
+
+
+class HuntTargetStrategy:
+    """Fire at random checkerboard cells until a hit, then at its
+    unexplored neighbours until the hit ships are sunk."""
+
+    def __init__(self, rng, width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+        self.rng = rng
+        self.open = set((x, y) for y in range(height) for x in range(width))
+        self.hunt = [c for c in self.open if (c[0] + c[1]) % 2 == 0]
+        self.rest = [c for c in self.open if (c[0] + c[1]) % 2 == 1]
+        rng.shuffle(self.hunt)
+        rng.shuffle(self.rest)
+        self.targets = []
+
+    def guess(self):
+        while self.targets:
+            cell = self.targets.pop()
+            if cell in self.open:
+                return cell
+        for cells in (self.hunt, self.rest):
+            while cells:
+                cell = cells.pop()
+                if cell in self.open:
+                    return cell
+        return self.rng.choice(sorted(self.open))
+
+    def feedback(self, x, y, result):
+        self.open.discard((x, y))
+        if result.outcome == HIT:
+            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+                if (x + dx, y + dy) in self.open:
+                    self.targets.append((x + dx, y + dy))
+
+
+def density_map(blocked, hits, sizes):
+    """Count, for every cell, the legal placements of the remaining ships
+    that cover it.
+
+    blocked and hits are board-sized (row y, column x) grids of 0/1: cells
+    that cannot hold an unsunk ship (misses and sunk ships), and hits not
+    yet assigned to a sunk ship. sizes lists the unsunk ship sizes. While
+    there are hits, only placements through them count, weighted by how
+    many hits they cover (target mode). Uses NumPy sliding windows when
+    available and plain loops otherwise.
+    """
+    if np is not None:
+        blocked = np.asarray(blocked, dtype=np.int32)
+        hits = np.asarray(hits, dtype=np.int32)
+        density = np.zeros(blocked.shape, dtype=np.int64)
+        target = hits.any()
+        for size in sizes:
+            density += _window_counts(blocked, hits, size, target)
+            density += _window_counts(blocked.T, hits.T, size, target).T
+        if target and not density.any():
+            return density_map(blocked, np.zeros_like(hits), sizes)
+        return density
+
+    height = len(blocked)
+    width = len(blocked[0])
+    target = False
+    for row in hits:
+        if 1 in row:
+            target = True
+    density = [[0] * width for _ in range(height)]
+    for size in sizes:
+        for vertical in (False, True):
+            lines = height
+            length = width
+            if vertical:
+                lines = width
+                length = height
+            for line in range(lines):
+                for start in range(length + 1 - size):
+                    cells = []
+                    for k in range(start, start + size):
+                        if vertical:
+                            cells.append((k, line))
+                        else:
+                            cells.append((line, k))
+                    weight = 1
+                    if target:
+                        weight = 0
+                    for y, x in cells:
+                        if blocked[y][x]:
+                            weight = -1
+                            break
+                        if target:
+                            weight += hits[y][x]
+                    if weight > 0:
+                        for y, x in cells:
+                            density[y][x] += weight
+    if target and max(max(row) for row in density) == 0:
+        return density_map(blocked, [[0] * width for _ in range(height)],
+                           sizes)
+    return density
+
+
+def _window_counts(blocked, hits, size, target):
+    """Coverage counts of every horizontal placement of one ship size."""
+    rows, cols = blocked.shape
+    counts = np.zeros((rows, cols), dtype=np.int64)
+    if size > cols:
+        return counts
+    padded = np.zeros((rows, cols + 1), dtype=np.int32)
+    np.cumsum(blocked, axis=1, out=padded[:, 1:])
+    blocked_in = padded[:, size:] - padded[:, :-size]
+    weight = (blocked_in == 0).astype(np.int64)
+    if target:
+        np.cumsum(hits, axis=1, out=padded[:, 1:])
+        weight *= padded[:, size:] - padded[:, :-size]
+
+    width = cols + 1 - size
+    k = 0
+    while k < size:
+        counts[:, k:k + width] += weight
+        k += 1
+    return counts
+
+
+class DensityStrategy:
+    """Always fire at the open cell covered by the most legal placements
+    of the unsunk ships (see density_map), using only what the game
+    prints: miss, hit, and which ship was sunk."""
+
+    def __init__(self, rng, width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+        self.rng = rng
+        self.width = width
+        self.height = height
+        self.blocked = [[0] * width for _ in range(height)]
+        self.hits = [[0] * width for _ in range(height)]
+        self.guessed = set()
+        self.remaining = dict(fleet)
+
+    def guess(self):
+        density = density_map(self.blocked, self.hits,
+                              list(self.remaining.values()))
+        best = -1
+        choices = []
+        for y in range(self.height):
+            for x in range(self.width):
+                if (x, y) in self.guessed:
+                    continue
+                value = int(density[y][x])
+                if value > best:
+                    best = value
+                    choices = [(x, y)]
+                elif value == best:
+                    choices.append((x, y))
+        return self.rng.choice(choices)
+
+    def feedback(self, x, y, result):
+        self.guessed.add((x, y))
+        if result.outcome == MISS:
+            self.blocked[y][x] = 1
+        elif result.outcome == HIT:
+            self.hits[y][x] = 1
+        elif result.outcome == SUNK:
+            self.hits[y][x] = 1
+            self._sink(x, y, self.remaining.pop(result.kind))
+
+    def _sink(self, x, y, size):
+        """Retire the hits that most plausibly made up the sunk ship."""
+        cells = [(x, y)]
+        for dx, dy in ((1, 0), (0, 1)):
+            for start in range(size):
+                run = []
+                for k in range(size):
+                    cx = x + (k - start) * dx
+                    cy = y + (k - start) * dy
+                    if (0 <= cx < self.width and 0 <= cy < self.height
+                            and self.hits[cy][cx]):
+                        run.append((cx, cy))
+                if len(run) == size:
+                    cells = run
+                    break
+            if len(cells) == size:
+                break
+        for cx, cy in cells:
+            self.hits[cy][cx] = 0
+            self.blocked[cy][cx] = 1
+
+
+def benchmark_density(moves=2000):
+    """Print the average time DensityStrategy takes to pick a move."""
+    rng = random.Random(24)
+    made = 0
+    elapsed = 0.0
+    while made < moves:
+        game = Game()
+        game.load_fleet(random_fleet(rng))
+        strategy = DensityStrategy(rng)
+        while not game.over and made < moves:
+            start = time.perf_counter()
+            x, y = strategy.guess()
+            elapsed += time.perf_counter() - start
+            strategy.feedback(x, y, game.fire(x, y))
+            made += 1
+    print("density solver: " + str(round(1e6 * elapsed / made, 1)) +
+          " us per move (numpy: " + str(np is not None) + ")")
+
+
+STRATEGIES = {"random": RandomStrategy, "hunt": HuntTargetStrategy,
+              "density": DensityStrategy}
+
+
+def play_game(fleet, strategy, width=WIDTH, height=HEIGHT,
+              fleet_sizes=FLEET_SIZES):
+    """Play one game to the end; return the number of shots it took.
+
+    fleet holds the placement lines; width, height and fleet_sizes are
+    the board and fleet definition they were made for.
+    """
+    game = new_game(width, height, fleet_sizes)
+    game.load_fleet(fleet)
+    shots = 0
+    while not game.over:
+        x, y = strategy.guess()
+        result = game.fire(x, y)
+        strategy.feedback(x, y, result)
+        shots += 1
+    return shots
+
+
+def _simulate_chunk(job):
+    """Worker: play a chunk of games; return {shots: number of games}."""
+    strategy_name, games, seed, width, height, fleet = job
+    rng = random.Random(seed)
+    strategy_class = STRATEGIES[strategy_name]
+    histogram = {}
+    g = 0
+    while g < games:
+        shots = play_game(random_fleet(rng, width, height, fleet),
+                          strategy_class(rng, width, height, fleet),
+                          width, height, fleet)
+        histogram[shots] = histogram.get(shots, 0) + 1
+        g += 1
+    return histogram
+
+
+def simulate(strategy_name, games, seed=0, workers=None, chunk=1000,
+             width=WIDTH, height=HEIGHT, fleet=FLEET_SIZES):
+    """Play games with a strategy across a process pool.
+
+    Chunks of games are seeded from (seed, chunk number), so results do
+    not depend on the worker count. Games are played on width x height
+    boards with fleet. Returns the merged histogram of shots-to-win and
+    the elapsed seconds.
+    """
+    jobs = []
+    start_game = 0
+    while start_game < games:
+        count = min(chunk, games - start_game)
+        jobs.append((strategy_name, count,
+                     str(seed) + ":" + str(len(jobs)), width, height, fleet))
+        start_game += count
+
+    start = time.perf_counter()
+    histogram = {}
+    executor = ProcessPoolExecutor(max_workers=workers)
+    for part in executor.map(_simulate_chunk, jobs):
+        for shots in part:
+            histogram[shots] = histogram.get(shots, 0) + part[shots]
+    executor.shutdown()
+    return histogram, time.perf_counter() - start
+
+
+def print_report(strategy_name, histogram, elapsed):
+    """Print games/s and the shots-to-win distribution of a simulation."""
+    games = sum(histogram.values())
+    total = 0
+    squares = 0
+    for shots in histogram:
+        total += shots * histogram[shots]
+        squares += shots * shots * histogram[shots]
+    mean = total / games
+    std = math.sqrt(max(0.0, squares / games - mean * mean))
+
+    shots_sorted = sorted(histogram)
+    median = shots_sorted[-1]
+    seen = 0
+    for shots in shots_sorted:
+        seen += histogram[shots]
+        if seen * 2 >= games:
+            median = shots
+            break
+
+    print(strategy_name + ": " + str(games) + " games in " +
+          str(round(elapsed, 2)) + " s (" + str(int(games / elapsed)) +
+          " games/s)")
+    print("  shots to win: mean " + str(round(mean, 2)) + ", std " +
+          str(round(std, 2)) + ", median " + str(median) + ", min " +
+          str(shots_sorted[0]) + ", max " + str(shots_sorted[-1]))
+    # buckets of 10 shots, widened tenfold until there are at most 11
+    step = 10
+    while shots_sorted[-1] >= 11 * step:
+        step *= 10
+    line = "  "
+    for low in range(0, shots_sorted[-1] + 1, step):
+        count = 0
+        for shots in histogram:
+            if low <= shots < low + step:
+                count += histogram[shots]
+        if count > 0:
+            line += str(low) + "-" + str(low + step - 1) + ": " + \
+                str(count) + "  "
+    print(line.rstrip())
+
+
+def simulate_main(args):
+    """Command line: simulate GAMES [STRATEGY...] [--workers N]
+    [--config FILE]."""
+    workers = None
+    if "--workers" in args:
+        i = args.index("--workers")
+        workers = int(args[i + 1])
+        args = args[:i] + args[i + 2:]
+    width, height, fleet = WIDTH, HEIGHT, FLEET_SIZES
+    if "--config" in args:
+        i = args.index("--config")
+        try:
+            width, height, fleet = read_config(args[i + 1])
+        except ValueError as e:
+            print("ERROR: " + str(e))
+            return
+        args = args[:i] + args[i + 2:]
+    games = int(args[0])
+    names = args[1:]
+    if not names:
+        names = sorted(STRATEGIES)
+    for name in names:
+        histogram, elapsed = simulate(name, games, 0, workers, 1000,
+                                      width, height, fleet)
+        print_report(name, histogram, elapsed)
+
+
+def read_lines(filename):
+    f = open(filename, "r")
+    lines = []
+    line = f.readline()
+    while line != "":
+        lines.append(line.strip())
+        line = f.readline()
+    f.close()
+    return lines
+
+
+def main(config_file=None):
+    """The assignment's game; config_file (see read_config) changes the
+    board size and fleet."""
+
+    game = Game()
+    if config_file is not None:
+        try:
+            width, height, fleet = read_config(config_file)
+        except ValueError as e:
+            print("ERROR: " + str(e))
+            sys.exit(0)
+        game = new_game(width, height, fleet)
+
+    placement_file = input()
+
+    error = game.load_fleet(read_lines(placement_file))
+    if error is not None:
+        print(error.message())
+        sys.exit(0)
+
+    guess_file = input()
+    for line in read_lines(guess_file):
+        guess = parse_guess(line)
+        if guess is None:
+            continue
+        result = game.fire(guess[0], guess[1])
+        for message in result.messages():
+            print(message)
+        if result.outcome == SUNK and result.game_over:
+            return
+
 
-main()
+if __name__ == "__main__":
+    # "simulate" runs the strategy simulator; otherwise the assignment,
+    # on the board and fleet of "--config FILE" if given
+    if len(sys.argv) > 1 and sys.argv[1] == "simulate":
+        simulate_main(sys.argv[2:])
+    elif len(sys.argv) > 2 and sys.argv[1] == "--config":
+        main(sys.argv[2])
+    else:
+        main()
@@ -5,6 +5,13 @@ Course: CSC 120, Fall 2025
 Purpose: Generate and print a grid of random lowercase letters.
 """
 import random
+import struct
+import hashlib
+
+try:
+    import numpy as np
+except ImportError:  # the array grid is optional
+    np = None
 
 
 def init():
@@ -15,8 +22,14 @@ def init():
     return grid_size
 
 
-def make_grid(grid_size):
-    """Create and return a grid_size x grid_size grid of random letters."""
+def make_grid(grid_size, as_array=False):
+    """
+    Create and return a grid_size x grid_size grid of random letters.
+    With as_array=True the same letters are returned as a uint8 NumPy
+    array of letter codes (the layout word_search.grid_to_array uses).
+    """
+    if as_array and np is None:
+        raise ImportError("the array grid representation needs numpy")
     grid = []
 
     # build each row
@@ -36,29 +49,189 @@ def make_grid(grid_size):
         grid.append(row)
         row_index = row_index + 1
 
+    if as_array:
+        data = "".join("".join(row) for row in grid).encode("ascii")
+        return np.frombuffer(data, dtype=np.uint8).reshape(grid_size,
+                                                           grid_size)
     return grid
 
 
 def print_grid(grid):
     """Print the grid, one row per line, letters separated by commas."""
+    if np is not None and isinstance(grid, np.ndarray):
+        for row in grid:
+            print(",".join(row.tobytes().decode("ascii")))
+        return
+
+    # one print per row: letters joined with commas, no trailing comma
     row_index = 0
     while row_index < len(grid):
-        row = grid[row_index]
+        print(",".join(grid[row_index]))
+        row_index = row_index + 1
 
-        col_index = 0
-        while col_index < len(row):
-            letter = row[col_index]
 
-            # print comma after each letter except the last
-            if col_index < len(row) - 1:
-                print(letter, end=",")
-            else:
-                print(letter, end="")
+# Fast, streamed generation--------------------------------------
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+# maps a random byte to a letter; bytes from 234 = 9 * 26 up are
+# dropped so that every letter is equally likely
+_BYTE_LETTERS = bytes(ord(LETTERS[b % 26]) for b in range(256))
+_UNEVEN_BYTES = bytes(range(9 * 26, 256))
+
+
+def row_stream(seed_value, row_index, count):
+    """The first count bytes of one row's own random stream."""
+    key = (str(seed_value) + ":" + str(row_index)).encode("utf-8")
+    return hashlib.shake_256(key).digest(count)
+
+
+def row_letters(grid_size, seed_value, row_index):
+    """One row of the grid as bytes of letters."""
+    count = grid_size + grid_size // 4 + 16
+    while True:
+        letters = row_stream(seed_value, row_index, count).translate(
+            _BYTE_LETTERS, _UNEVEN_BYTES)
+        if len(letters) >= grid_size:
+            return letters[:grid_size]
+        count = count * 2
+
+
+def generate_rows(grid_size, seed_value, start_row=0, stop_row=None,
+                  compatible=False):
+    """
+    Yield rows start_row..stop_row-1 of a grid as bytes of letters.
+
+    By default every row has its own random stream, SHAKE-256 of
+    (seed_value, row), turned into letters with one bytes.translate, so
+    any range of rows can be generated on its own: in parallel, or to
+    resume a run, and the grid is the same with or without NumPy.
+    compatible=True instead reproduces make_grid() after
+    random.seed(seed_value) exactly; it must draw every earlier letter,
+    so skipped rows are still generated.
+    """
+    if stop_row is None:
+        stop_row = grid_size
+
+    if compatible:
+        random.seed(seed_value)
+        row_index = 0
+        while row_index < stop_row:
+            row = []
+            col_index = 0
+            while col_index < grid_size:
+                row.append(LETTERS[random.randint(0, 25)])
+                col_index = col_index + 1
+            if row_index >= start_row:
+                yield "".join(row).encode("ascii")
+            row_index = row_index + 1
+        return
+
+    row_index = start_row
+    while row_index < stop_row:
+        yield row_letters(grid_size, seed_value, row_index)
+        row_index = row_index + 1
 
-            col_index = col_index + 1
 
-        print()  # newline at end of row
+def write_grid(out, grid_size, seed_value, start_row=0, stop_row=None,
+               compatible=False):
+    """
+    Write rows of the grid to the binary file out in print_grid's format,
+    one write per row, without ever holding more than one row.
+    """
+    for letters in generate_rows(grid_size, seed_value, start_row, stop_row,
+                                 compatible):
+        if np is not None:
+            line = np.full(2 * len(letters), ord(","), dtype=np.uint8)
+            line[0::2] = np.frombuffer(letters, dtype=np.uint8)
+            line[-1] = ord("\n")
+            out.write(line.tobytes())
+        else:
+            text = ",".join(letters.decode("ascii")) + "\n"
+            out.write(text.encode("ascii"))
+
+
+# Binary grid files and in-memory grids---------------------------
+
+GRID_MAGIC = b"WGRD"
+
+
+def make_grid_rows(grid_size, seed_value, compatible=False):
+    """
+    Generate a grid in memory as a list of row strings, ready for
+    word_search.find_words() with no text formatting or parsing.
+    """
+    rows = []
+    for letters in generate_rows(grid_size, seed_value,
+                                 compatible=compatible):
+        rows.append(letters.decode("ascii"))
+    return rows
+
+
+def write_grid_file(filename, grid_size, seed_value, compatible=False):
+    """
+    Generate a grid straight into a binary grid file: GRID_MAGIC, the row
+    and column counts as little-endian uint32s, then one byte per letter,
+    row by row. word_search reads these files like its text grids.
+    """
+    f = open(filename, "wb")
+    f.write(GRID_MAGIC + struct.pack("<II", grid_size, grid_size))
+    for letters in generate_rows(grid_size, seed_value,
+                                 compatible=compatible):
+        f.write(letters)
+    f.close()
+
+
+def save_grid_file(grid, filename):
+    """Write an existing grid (lists, row strings or array) in binary form."""
+    n_rows = len(grid)
+    n_cols = 0
+    if n_rows > 0:
+        n_cols = len(grid[0])
+    f = open(filename, "wb")
+    f.write(GRID_MAGIC + struct.pack("<II", n_rows, n_cols))
+    for row in grid:
+        if np is not None and isinstance(row, np.ndarray):
+            f.write(row.tobytes())
+        else:
+            f.write("".join(row).encode("ascii"))
+    f.close()
+
+
+def is_grid_file(filename):
+    f = open(filename, "rb")
+    magic = f.read(len(GRID_MAGIC))
+    f.close()
+    return magic == GRID_MAGIC
+
+
+def read_grid_file(filename, as_array=False):
+    """
+    Read a binary grid file as a list of row strings, or as a uint8 array
+    memory-mapped from the file if as_array is True.
+    """
+    f = open(filename, "rb")
+    header = f.read(len(GRID_MAGIC) + 8)
+    if header[:len(GRID_MAGIC)] != GRID_MAGIC:
+        f.close()
+        raise ValueError(filename + " is not a binary grid file")
+    n_rows, n_cols = struct.unpack("<II", header[len(GRID_MAGIC):])
+
+    if as_array:
+        f.close()
+        if np is None:
+            raise ImportError("the array grid representation needs numpy")
+        return np.memmap(filename, dtype=np.uint8, mode="r",
+                         offset=len(header), shape=(n_rows, n_cols))
+
+    rows = []
+    row_index = 0
+    while row_index < n_rows:
+        rows.append(f.read(n_cols).decode("ascii"))
         row_index = row_index + 1
+    f.close()
+    return rows
 
 
 def main():
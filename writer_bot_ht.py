@@ -10,106 +10,664 @@ prefix, updating the prefix, and collecting words until the
 desired length is reached. Finally, it prints the generated
 words ten per line as required.
 """
+import os
 import sys
+import math
+import mmap
 import random
+import time
+import tracemalloc
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
 SEED = 8
 NONWORD = '@'
 
+LINEAR = 'linear'
+QUADRATIC = 'quadratic'
+DOUBLE = 'double'
+ROBINHOOD = 'robinhood'
+PROBING = (LINEAR, QUADRATIC, DOUBLE, ROBINHOOD)
 
-class Hashtable:
-    """Hash table with linear probing (decrement by 1)."""
+# marks a slot freed by remove() under quadratic or double probing
+_DELETED = [None, None]
+
+
+MASK64 = (1 << 64) - 1
+
+
+def mix_hash(p):
+    """Spread a polynomial value over 64 bits (splitmix64's finalizer)."""
+    p = p & MASK64
+    p = ((p ^ (p >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+    p = ((p ^ (p >> 27)) * 0x94d049bb133111eb) & MASK64
+    return p ^ (p >> 31)
+
+
+def key_hash(key):
+    """Unreduced hash of a string or tuple-of-IDs key.
+
+    Strings keep the assignment's polynomial-31 hash. Word IDs are small,
+    so the same polynomial over a tuple stays below about 31 ** (n - 1)
+    times the vocabulary and would pile every key into the low slots; it
+    is passed through mix_hash first.
+    """
+    p = 0
+    if isinstance(key, tuple):
+        for word_id in key:
+            p = 31 * p + word_id
+        return mix_hash(p)
+    for c in key:
+        p = 31 * p + ord(c)
+    return p
 
-    def __init__(self, size):
+
+class Hashtable:
+    """Hash table with linear probing (decrement by 1).
+
+    By default the table keeps the fixed size it was created with, exactly
+    as before. Passing a load_factor turns on growth mode: once the number
+    of stored keys would exceed load_factor * size, the backing list is
+    rehashed into a table about twice as large, so put/get stay amortized
+    O(1). Passing a shrink_factor as well lets remove() rehash into a
+    smaller table when the load drops below it.
+
+    probing selects the collision strategy: 'linear' (the default),
+    'quadratic' (triangular steps), 'double' (a second, hash-derived step)
+    or 'robinhood' (linear, but entries far from home displace entries
+    close to theirs). Quadratic probing only reaches every slot when the
+    size is a power of two, so quadratic tables round their size up to one
+    and grow and shrink by doubling and halving. Every lookup and insert
+    is counted; see stats().
+
+    A put that finds no free slot grows the table in growth mode. A
+    fixed-size linear table ignores the key, as the assignment's table
+    always has; the other strategies raise ValueError.
+    """
+
+    def __init__(self, size, load_factor=None, shrink_factor=None,
+                 probing=LINEAR):
+        if size < 1:
+            size = 1
+        if probing not in PROBING:
+            raise ValueError('unknown probing strategy: ' + str(probing))
+        if probing == QUADRATIC:
+            power = 1
+            while power < size:
+                power *= 2
+            size = power
         self._pairs = []
         i = 0
         while i < size:
             self._pairs.append(None)
             i += 1
         self._size = size
+        self._count = 0
+        self._deleted = 0
+        self._min_size = size
+        self._load_factor = load_factor
+        self._shrink_factor = shrink_factor
+        self._probing = probing
+        self.reset_stats()
+
+    def _hash(self, key, h=None):
+        """Polynomial-31 hash of key, reduced to a slot index.
+
+        String keys hash their characters; tuple keys (see PrefixWindow)
+        hash their integer word IDs. A precomputed h skips the loop.
+        """
+        if h is None:
+            h = key_hash(key)
+        return h % self._size
+
+    def _step(self, h):
+        """Probe step for double hashing; 1 for the other strategies."""
+        if self._probing != DOUBLE or self._size < 2:
+            return 1
+        step = 1 + (h // self._size) % (self._size - 1)
+        while math.gcd(step, self._size) != 1:
+            step -= 1
+        return step
+
+    def _next(self, index, count, step):
+        if self._probing == QUADRATIC:
+            return (index - count - 1) % self._size
+        return (index - step) % self._size
+
+    def _record(self, probes):
+        self._ops += 1
+        self._probes += probes
+        if probes > self._max_probe:
+            self._max_probe = probes
+
+    def _find(self, key, h=None):
+        """Return the slot index holding key, or -1 if it is not stored."""
+        if h is None:
+            h = key_hash(key)
+        index = h % self._size
+        step = self._step(h)
+        robinhood = self._probing == ROBINHOOD
+        count = 0
+
+        while count < self._size:
+            pair = self._pairs[index]
+
+            if pair is None:
+                break
 
-    def _hash(self, key):
-        p = 0
-        for c in key:
-            p = 31 * p + ord(c)
-        return p % self._size
+            if pair is not _DELETED:
+                if pair[0] == key:
+                    self._record(count + 1)
+                    return index
+                # key would have displaced anything closer to its home
+                if robinhood and (pair[2] - index) % self._size < count:
+                    break
 
-    def put(self, key, value):
-        index = self._hash(key)
+            index = self._next(index, count, step)
+            count += 1
+
+        self._record(count + 1)
+        return -1
+
+    def _resize(self, new_size):
+        """Rehash every stored pair into a backing list of new_size slots."""
+        old_pairs = self._pairs
+        self._pairs = []
+        i = 0
+        while i < new_size:
+            self._pairs.append(None)
+            i += 1
+        self._size = new_size
+        self._count = 0
+        self._deleted = 0
+
+        i = 0
+        while i < len(old_pairs):
+            pair = old_pairs[i]
+            if pair is not None and pair is not _DELETED:
+                self._insert(pair[0], pair[1])
+            i += 1
+
+    def _insert(self, key, value, h=None):
+        """Probe and insert/update; returns False if the table is full."""
+        if h is None:
+            h = key_hash(key)
+        index = h % self._size
+        if self._probing == ROBINHOOD:
+            if self._count == self._size:
+                # displacing entries first would drop one of them when
+                # no slot is free, so a full table only takes updates
+                found = self._find(key, h)
+                if found < 0:
+                    return False
+                self._pairs[found][1] = value
+                return True
+            return self._insert_robinhood(key, value, index)
+
+        step = self._step(h)
+        tombstone = -1
         count = 0
 
         while count < self._size:
             pair = self._pairs[index]
 
             if pair is None:   # empty slot
-                self._pairs[index] = [key, value]
-                return
+                break
 
-            if pair[0] == key:  # update
+            if pair is _DELETED:
+                if tombstone < 0:
+                    tombstone = index
+            elif pair[0] == key:  # update
                 pair[1] = value
-                return
+                self._record(count + 1)
+                return True
 
-            index -= 1
-            if index < 0:
-                index = self._size - 1
+            index = self._next(index, count, step)
             count += 1
 
-    def get(self, key):
-        index = self._hash(key)
+        self._record(count + 1)
+        if tombstone >= 0:
+            index = tombstone
+            self._deleted -= 1
+        elif count == self._size:
+            return False
+        self._pairs[index] = [key, value]
+        self._count += 1
+        return True
+
+    def _insert_robinhood(self, key, value, index):
+        # pairs carry their home slot so displacement is (home - index)
+        entry = [key, value, index]
+        dist = 0
         count = 0
 
         while count < self._size:
             pair = self._pairs[index]
 
             if pair is None:
-                return None
+                self._pairs[index] = entry
+                self._count += 1
+                self._record(count + 1)
+                return True
 
             if pair[0] == key:
-                return pair[1]
+                pair[1] = value
+                self._record(count + 1)
+                return True
+
+            pair_dist = (pair[2] - index) % self._size
+            if pair_dist < dist:
+                self._pairs[index] = entry
+                entry = pair
+                dist = pair_dist
 
+            index = (index - 1) % self._size
+            dist += 1
+            count += 1
+
+        self._record(count + 1)
+        return False
+
+    def _grown_size(self):
+        if self._probing == QUADRATIC:
+            return 2 * self._size
+        return 2 * self._size + 1
+
+    def put(self, key, value, h=None):
+        if self._load_factor is not None:
+            limit = self._load_factor * self._size
+            used = self._count + self._deleted
+            if used + 1 > limit and self._find(key, h) < 0:
+                if self._count + 1 > limit:
+                    self._resize(self._grown_size())
+                else:
+                    self._resize(self._size)
+
+        while not self._insert(key, value, h):
+            if self._load_factor is not None:
+                self._resize(self._grown_size())
+            elif self._probing == LINEAR:
+                return   # the assignment's fixed table drops the key
+            else:
+                raise ValueError('hashtable is full')
+
+    def get(self, key, h=None):
+        index = self._find(key, h)
+        if index < 0:
+            return None
+        return self._pairs[index][1]
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def remove(self, key):
+        """Remove key and return its value (None if it was not stored).
+
+        With linear probing the rest of the probe cluster is re-inserted,
+        and Robin Hood shifts it back one slot, so later lookups never stop
+        early at the freed slot. Quadratic and double hashing leave a
+        tombstone that lookups skip and inserts reuse.
+        """
+        index = self._find(key)
+        if index < 0:
+            return None
+
+        value = self._pairs[index][1]
+        self._count -= 1
+
+        if self._probing == LINEAR:
+            self._pairs[index] = None
+            self._reinsert_cluster(index)
+        elif self._probing == ROBINHOOD:
+            self._backward_shift(index)
+        else:
+            self._pairs[index] = _DELETED
+            self._deleted += 1
+
+        if self._shrink_factor is not None:
+            if self._count < self._shrink_factor * self._size:
+                new_size = self._size // 2
+                if new_size >= self._min_size:
+                    self._resize(new_size)
+
+        return value
+
+    def _reinsert_cluster(self, index):
+        # re-insert the pairs that follow in the same cluster
+        index -= 1
+        if index < 0:
+            index = self._size - 1
+        count = 0
+        while self._pairs[index] is not None and count < self._size:
+            pair = self._pairs[index]
+            self._pairs[index] = None
+            self._count -= 1
+            self._insert(pair[0], pair[1])
             index -= 1
             if index < 0:
                 index = self._size - 1
             count += 1
 
-        return None
+    def _backward_shift(self, index):
+        # pull each displaced follower one slot closer to its home
+        following = (index - 1) % self._size
+        pair = self._pairs[following]
+        while pair is not None and pair[2] != following:
+            self._pairs[index] = pair
+            index = following
+            following = (index - 1) % self._size
+            pair = self._pairs[following]
+        self._pairs[index] = None
+
+    def items(self):
+        """Yield every stored (key, value) pair in slot order."""
+        i = 0
+        while i < self._size:
+            pair = self._pairs[i]
+            if pair is not None and pair is not _DELETED:
+                yield pair[0], pair[1]
+            i += 1
 
-    def __contains__(self, key):
-        index = self._hash(key)
+    def load(self):
+        """Return the current load factor (stored keys / slots)."""
+        return self._count / self._size
+
+    def reset_stats(self):
+        """Zero the probe counters reported by stats()."""
+        self._ops = 0
+        self._probes = 0
+        self._max_probe = 0
+
+    def stats(self):
+        """Return a dict describing how well the table is performing.
+
+        avg_probe and max_probe count slots examined per get/put/contains
+        since the last reset_stats(); clusters maps each run length of
+        consecutive occupied slots (tombstones included) to how many such
+        runs there are.
+        """
+        clusters = {}
+        run = 0
+        first_run = -1
+        i = 0
+        while i < self._size:
+            if self._pairs[i] is None:
+                if run > 0:
+                    if first_run < 0:
+                        first_run = run
+                    else:
+                        clusters[run] = clusters.get(run, 0) + 1
+                elif first_run < 0:
+                    first_run = 0
+                run = 0
+            else:
+                run += 1
+            i += 1
+        # the table is circular: the last run joins the first one
+        if first_run < 0:
+            clusters[run] = 1
+        else:
+            run += first_run
+            if run > 0:
+                clusters[run] = clusters.get(run, 0) + 1
+
+        avg = 0.0
+        if self._ops > 0:
+            avg = self._probes / self._ops
+        return {
+            'probing': self._probing,
+            'size': self._size,
+            'count': self._count,
+            'tombstones': self._deleted,
+            'load_factor': self.load(),
+            'operations': self._ops,
+            'avg_probe': avg,
+            'max_probe': self._max_probe,
+            'clusters': dict(sorted(clusters.items())),
+        }
+
+    def __str__(self):
+        s = '{'
+        first = True
+        for key, value in self.items():
+            if not first:
+                s = s + ', '
+            s = s + str(key) + ': ' + str(value)
+            first = False
+        s = s + '}'
+        return s
+
+
+class CompactHashtable:
+    """Hashtable with the same API, stored as parallel arrays.
+
+    Keys and values live in two flat lists, each slot's hash in an
+    array('Q') and its low 8 bits again in a bytearray, so there are no
+    per-entry pair lists. Probing compares the 8-bit tags before keys:
+    reading a bytearray gives back cached small ints, so the probe loop
+    allocates nothing. Resizing re-places entries from the stored hashes
+    instead of rehashing every key; a hash of 64 bits or more (a long
+    string key) is stored as MASK64 and recomputed. An empty slot holds
+    the key None. Slot placement is the same as Hashtable's, so __str__
+    matches for the same inserts.
+    """
+
+    __slots__ = ('_keys', '_values', '_hashes', '_tags', '_size',
+                 '_count', '_min_size', '_load_factor', '_shrink_factor')
+
+    def __init__(self, size, load_factor=None, shrink_factor=None):
+        if size < 1:
+            size = 1
+        self._keys = [None] * size
+        self._values = [None] * size
+        self._hashes = array('Q', [0]) * size
+        self._tags = bytearray(size)
+        self._size = size
+        self._count = 0
+        self._min_size = size
+        self._load_factor = load_factor
+        self._shrink_factor = shrink_factor
+
+    def _find(self, key, h=None):
+        if h is None:
+            h = key_hash(key)
+        tag = h & 0xFF
+        size = self._size
+        index = h % size
+        keys = self._keys
+        tags = self._tags
         count = 0
 
-        while count < self._size:
-            pair = self._pairs[index]
+        while count < size:
+            stored = keys[index]
 
-            if pair is None:
-                return False
+            if stored is None:
+                return -1
 
-            if pair[0] == key:
+            if tags[index] == tag and stored == key:
+                return index
+
+            index -= 1
+            if index < 0:
+                index = size - 1
+            count += 1
+
+        return -1
+
+    def _stored_hash(self, index):
+        """The hash stored for a slot, or None if it must be recomputed."""
+        h = self._hashes[index]
+        if h == MASK64:
+            return None
+        return h
+
+    def _resize(self, new_size):
+        old_keys = self._keys
+        old_values = self._values
+        old_hashes = self._hashes
+        self._keys = [None] * new_size
+        self._values = [None] * new_size
+        self._hashes = array('Q', [0]) * new_size
+        self._tags = bytearray(new_size)
+        self._size = new_size
+        self._count = 0
+
+        i = 0
+        while i < len(old_keys):
+            if old_keys[i] is not None:
+                h = old_hashes[i]
+                if h == MASK64:
+                    h = None
+                self._insert(old_keys[i], old_values[i], h)
+            i += 1
+
+    def _insert(self, key, value, h=None):
+        if h is None:
+            h = key_hash(key)
+        tag = h & 0xFF
+        size = self._size
+        index = h % size
+        keys = self._keys
+        count = 0
+
+        while count < size:
+            stored = keys[index]
+
+            if stored is None:   # empty slot
+                self._hashes[index] = min(h, MASK64)
+                self._tags[index] = tag
+                keys[index] = key
+                self._values[index] = value
+                self._count += 1
+                return True
+
+            if self._tags[index] == tag and stored == key:  # update
+                self._values[index] = value
                 return True
 
             index -= 1
             if index < 0:
-                index = self._size - 1
+                index = size - 1
             count += 1
 
         return False
 
-    def __str__(self):
-        s = '{'
-        first = True
+    def put(self, key, value, h=None):
+        if h is None:
+            h = key_hash(key)
+        if self._load_factor is not None:
+            limit = self._load_factor * self._size
+            if self._count + 1 > limit and self._find(key, h) < 0:
+                self._resize(2 * self._size + 1)
+        self._insert(key, value, h)
+
+    def get(self, key, h=None):
+        index = self._find(key, h)
+        if index < 0:
+            return None
+        return self._values[index]
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def __len__(self):
+        return self._count
+
+    def _clear_slot(self, index):
+        self._tags[index] = 0
+        self._keys[index] = None
+        self._values[index] = None
+        self._count -= 1
+
+    def remove(self, key):
+        """Remove key and return its value (None if it was not stored)."""
+        index = self._find(key)
+        if index < 0:
+            return None
+
+        value = self._values[index]
+        self._clear_slot(index)
+
+        # re-insert the entries that follow in the same cluster
+        index -= 1
+        if index < 0:
+            index = self._size - 1
+        count = 0
+        while self._keys[index] is not None and count < self._size:
+            k = self._keys[index]
+            v = self._values[index]
+            h = self._stored_hash(index)
+            self._clear_slot(index)
+            self._insert(k, v, h)
+            index -= 1
+            if index < 0:
+                index = self._size - 1
+            count += 1
+
+        if self._shrink_factor is not None:
+            if self._count < self._shrink_factor * self._size:
+                new_size = self._size // 2
+                if new_size >= self._min_size:
+                    self._resize(new_size)
+
+        return value
+
+    def items(self):
         i = 0
         while i < self._size:
-            pair = self._pairs[i]
-            if pair is not None:
-                if not first:
-                    s = s + ', '
-                s = s + str(pair[0]) + ': ' + str(pair[1])
-                first = False
+            if self._keys[i] is not None:
+                yield self._keys[i], self._values[i]
             i += 1
+
+    def load(self):
+        return self._count / self._size
+
+    def __str__(self):
+        s = '{'
+        first = True
+        for key, value in self.items():
+            if not first:
+                s = s + ', '
+            s = s + str(key) + ': ' + str(value)
+            first = False
         s = s + '}'
         return s
 
 
+def benchmark_storage(filename, n, size, lookups=200000):
+    """Compare memory and speed of Hashtable and CompactHashtable.
+
+    Builds a table from filename with each storage engine and prints the
+    memory allocated for it (tracemalloc), the build time and the rate of
+    get() calls over the stored prefixes.
+    """
+    for cls in (Hashtable, CompactHashtable):
+        tracemalloc.start()
+        start = time.perf_counter()
+        table = cls(size, 0.75)
+        build_table(table, filename, n)
+        build_time = time.perf_counter() - start
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        keys = [key for key, value in table.items()]
+        start = time.perf_counter()
+        i = 0
+        while i < lookups:
+            table.get(keys[i % len(keys)])
+            i += 1
+        get_time = time.perf_counter() - start
+
+        print(cls.__name__ + ': ' + str(len(table)) + ' keys, ' +
+              str(current // 1024) + ' KiB, build ' +
+              str(round(build_time, 3)) + ' s, ' +
+              str(int(lookups / get_time)) + ' gets/s')
+
+
 def make_prefix(words):
     prefix = ''
     i = 0
@@ -121,39 +679,288 @@ def make_prefix(words):
     return prefix
 
 
-def add_suffix(table, prefix, word):
+class SuffixCounts:
+    """Suffixes of one prefix, each distinct word stored once with a count.
+
+    sample() draws a word with probability count / total in O(1) using
+    Vose's alias method; the alias tables are built on first use and
+    cached until the next add(), published as one (prob, alias) pair so
+    threads sampling the same prefix never see half of them. With
+    keep_order=True the occurrence order is also kept (one small int per
+    occurrence) and sample() instead picks exactly the word
+    random.randrange would pick from the plain list, so seeded output
+    matches the list-based table.
+
+    Most prefixes in real text are followed by a single word, so until a
+    second distinct word arrives only that word and the total are kept;
+    the words/counts lists and the order array appear with the second one.
+    """
+
+    __slots__ = ('_words', '_counts', 'total', '_index', '_order',
+                 '_alias')
+
+    # distinct words searched with list.index before a dict is built
+    INDEX_AFTER = 8
+
+    def __init__(self, keep_order=False):
+        self._words = None    # the only word until _counts is a list
+        self._counts = None
+        self.total = 0
+        self._index = None
+        self._order = None
+        if keep_order:
+            self._order = True    # every occurrence is the only word
+        self._alias = None    # (prob, alias) once built
+
+    @property
+    def words(self):
+        if self._counts is not None:
+            return self._words
+        if self.total == 0:
+            return []
+        return [self._words]
+
+    @property
+    def counts(self):
+        if self._counts is not None:
+            return self._counts
+        if self.total == 0:
+            return []
+        return [self.total]
+
+    def add(self, word, count=1):
+        self._alias = None
+        if self._counts is None:
+            if self.total == 0 or word == self._words:
+                self._words = word
+                self.total += count
+                return
+            self._words = [self._words]
+            self._counts = [self.total]
+            if self._order is True:
+                self._order = array('I', [0]) * self.total
+
+        words = self._words
+        if self._index is None and len(words) > self.INDEX_AFTER:
+            # after compact(), or once the list grows past INDEX_AFTER
+            self._index = {}
+            j = 0
+            while j < len(words):
+                self._index[words[j]] = j
+                j += 1
+        if self._index is not None:
+            i = self._index.get(word)
+        elif word in words:
+            i = words.index(word)
+        else:
+            i = None
+        if i is None:
+            i = len(words)
+            words.append(word)
+            self._counts.append(0)
+            if self._index is not None:
+                self._index[word] = i
+        self._counts[i] += count
+        self.total += count
+        if self._order is not None:
+            j = 0
+            while j < count:
+                self._order.append(i)
+                j += 1
+
+    def compact(self):
+        """Drop the build-time word index; the next add() rebuilds it for
+        prefixes with more than INDEX_AFTER distinct words."""
+        self._index = None
+
+    def __len__(self):
+        return self.total
+
+    def _build_alias(self):
+        k = len(self._words)
+        total = self.total
+        scaled = []
+        i = 0
+        while i < k:
+            scaled.append(self._counts[i] * k)
+            i += 1
+
+        prob = [total] * k
+        alias = list(range(k))
+        small = []
+        large = []
+        i = 0
+        while i < k:
+            if scaled[i] < total:
+                small.append(i)
+            else:
+                large.append(i)
+            i += 1
+
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = g
+            scaled[g] -= total - scaled[s]
+            if scaled[g] < total:
+                small.append(g)
+            else:
+                large.append(g)
+
+        tables = (prob, alias)
+        self._alias = tables
+        return tables
+
+    def sample(self, rng=random):
+        if self._counts is None:
+            # draw anyway so the seeded stream matches the other paths
+            rng.randrange(self.total)
+            return self._words
+        if self._order is not None:
+            return self._words[self._order[rng.randrange(self.total)]]
+
+        tables = self._alias
+        if tables is None:
+            tables = self._build_alias()
+        prob, alias = tables
+        i, r = divmod(rng.randrange(len(self._words) * self.total),
+                      self.total)
+        if r < prob[i]:
+            return self._words[i]
+        return self._words[alias[i]]
+
+    def __str__(self):
+        s = '{'
+        i = 0
+        while i < len(self.words):
+            if i > 0:
+                s = s + ', '
+            s = s + str(self.words[i]) + ': ' + str(self.counts[i])
+            i += 1
+        s = s + '}'
+        return s
+
+
+def add_suffix(table, prefix, word, weighted=False, keep_order=False):
     if prefix in table:
-        table.get(prefix).append(word)
+        suffixes = table.get(prefix)
+        if weighted:
+            suffixes.add(word)
+        else:
+            suffixes.append(word)
     else:
-        lst = []
-        lst.append(word)
+        if weighted:
+            lst = SuffixCounts(keep_order)
+            lst.add(word)
+        else:
+            lst = []
+            lst.append(word)
         table.put(prefix, lst)
 
 
-def build_table(table, filename, n):
-    """Build prefix→suffix table from entire file as ONE continuous stream."""
+def choose_suffix(suffixes, rng=random):
+    """Pick a random suffix from a plain list or a SuffixCounts."""
+    if isinstance(suffixes, SuffixCounts):
+        return suffixes.sample(rng)
+    return suffixes[rng.randrange(len(suffixes))]
 
-    # start prefix as NONWORD repeated n times
-    prefix_words = []
-    i = 0
-    while i < n:
-        prefix_words.append(NONWORD)
-        i += 1
 
-    # read ENTIRE file as one string (critical for autograder match)
+class WordPool:
+    """Interns words as small integer IDs; NONWORD is always ID 0."""
+
+    def __init__(self):
+        self._ids = {NONWORD: 0}
+        self._words = [NONWORD]
+
+    def id_of(self, word):
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._ids[word] = word_id
+            self._words.append(word)
+        return word_id
+
+    def word(self, word_id):
+        return self._words[word_id]
+
+    def __len__(self):
+        return len(self._words)
+
+
+class PrefixWindow:
+    """Rolling window of the last n word IDs with an incremental hash.
+
+    The polynomial is rolled in O(1) per word and hash is its mix_hash,
+    which equals key_hash of the window's tuple, so shifting a word in
+    never rebuilds and rehashes a prefix.
+    """
+
+    def __init__(self, n):
+        self._ids = deque([0] * n, maxlen=n)
+        self._top = 31 ** (n - 1)
+        self._rolling = 0
+        self.hash = mix_hash(0)
+
+    def shift(self, word_id):
+        oldest = self._ids[0]
+        self._ids.append(word_id)
+        self._rolling = (self._rolling - oldest * self._top) * 31 + word_id
+        self.hash = mix_hash(self._rolling)
+
+    def key(self):
+        return tuple(self._ids)
+
+
+def read_words(filename, chunk_size=1 << 16):
+    """Yield the whitespace-separated words of a file, chunk by chunk.
+
+    Produces the same words as open(filename).read().split(), but only
+    one chunk (plus a word cut at its end) is held in memory at a time.
+    """
     f = open(filename, 'r')
-    text = f.read()
+    partial = ''
+    chunk = f.read(chunk_size)
+    while chunk != '':
+        words = (partial + chunk).split()
+        partial = ''
+        if words and not chunk[-1].isspace():
+            # last word may continue in the next chunk
+            partial = words.pop()
+        for word in words:
+            yield word
+        chunk = f.read(chunk_size)
     f.close()
+    if partial != '':
+        yield partial
+
+
+def compact_suffixes(table):
+    """Release the build-time indexes of every SuffixCounts in table."""
+    for key, suffixes in table.items():
+        if isinstance(suffixes, SuffixCounts):
+            suffixes.compact()
 
-    # split on whitespace ONLY; punctuation preserved
-    words = text.split()
 
+def build_table(table, filename, n, weighted=False, keep_order=False):
+    """Build prefix→suffix table from entire file as ONE continuous stream.
+
+    With weighted=True each prefix maps to a SuffixCounts instead of a
+    list of every occurrence (see SuffixCounts for keep_order).
+    """
+
+    # start prefix as NONWORD repeated n times
+    prefix_words = []
     i = 0
-    while i < len(words):
-        word = words[i]
+    while i < n:
+        prefix_words.append(NONWORD)
+        i += 1
 
+    # the file is ONE continuous stream of whitespace-separated words;
+    # read_words yields exactly text.split() without holding the whole text
+    for word in read_words(filename):
         prefix = make_prefix(prefix_words)
-        add_suffix(table, prefix, word)
+        add_suffix(table, prefix, word, weighted, keep_order)
 
         # shift prefix
         j = 0
@@ -162,83 +969,698 @@ def build_table(table, filename, n):
             j += 1
         prefix_words[n - 1] = word
 
-        i += 1
-
     # Add ONE terminator only after all words are processed
     final_prefix = make_prefix(prefix_words)
-    add_suffix(table, final_prefix, NONWORD)
-
+    add_suffix(table, final_prefix, NONWORD, weighted, keep_order)
+    if weighted:
+        compact_suffixes(table)
+
+
+def build_table_ids(table, filename, n, pool, weighted=False,
+                    keep_order=False):
+    """Like build_table, but keys are tuples of word IDs from pool.
+
+    Suffix lists hold word IDs in the same order build_table stores the
+    words, so generate_text_ids produces the same text for the same seed.
+    """
+    window = PrefixWindow(n)
+
+    for word in read_words(filename):
+        word_id = pool.id_of(word)
+        _add_suffix_id(table, window, word_id, weighted, keep_order)
+        window.shift(word_id)
+
+    _add_suffix_id(table, window, 0, weighted, keep_order)
+    if weighted:
+        compact_suffixes(table)
+
+
+def _add_suffix_id(table, window, word_id, weighted, keep_order):
+    key = window.key()
+    suffixes = table.get(key, window.hash)
+    if suffixes is None:
+        if weighted:
+            suffixes = SuffixCounts(keep_order)
+        else:
+            suffixes = []
+        table.put(key, suffixes, window.hash)
+    if weighted:
+        suffixes.add(word_id)
+    else:
+        suffixes.append(word_id)
+
+
+def benchmark_prefix_keys(filename, n, size=1024):
+    """Build filename with string prefixes and with word-ID tuples and
+    print the time and probe statistics of each.
+
+    Both paths should probe about equally often; an ID path that probes
+    far more means the tuple hashes are clustering.
+    """
+    for label in ('strings', 'word IDs'):
+        table = Hashtable(size, 0.75)
+        start = time.perf_counter()
+        if label == 'strings':
+            build_table(table, filename, n)
+        else:
+            build_table_ids(table, filename, n, WordPool())
+        elapsed = time.perf_counter() - start
+        stats = table.stats()
+        print(label + ': ' + str(stats['count']) + ' keys, build ' +
+              str(round(elapsed, 3)) + ' s, avg probe ' +
+              str(round(stats['avg_probe'], 2)) + ', max probe ' +
+              str(stats['max_probe']))
+
+
+def _count_file(job):
+    """Worker for build_table_parallel: transitions inside one file.
+
+    Only transitions whose whole prefix lies inside the file are counted;
+    the first n words (head) and last n words (tail) are returned so the
+    parent can stitch the transitions that cross file boundaries.
+    """
+    filename, n, counted = job
+    head = []
+    window = deque(maxlen=n)
+    count = 0
+    transitions = {}
 
-def generate_text(table, n, max_words):
-    result = []
+    for word in read_words(filename):
+        count += 1
+        if count <= n:
+            head.append(word)
+            window.append(word)
+            continue
+        prefix = ' '.join(window)
+        window.append(word)
+        suffixes = transitions.get(prefix)
+        if suffixes is None:
+            suffixes = {} if counted else []
+            transitions[prefix] = suffixes
+        if counted:
+            suffixes[word] = suffixes.get(word, 0) + 1
+        else:
+            suffixes.append(word)
+
+    return head, list(window), count, transitions
+
+
+def _merge_suffixes(table, prefix, words, weighted, keep_order):
+    """Fold a worker's list or {word: count} dict into table[prefix]."""
+    suffixes = table.get(prefix)
+    if suffixes is None:
+        if weighted:
+            suffixes = SuffixCounts(keep_order)
+        else:
+            suffixes = []
+        table.put(prefix, suffixes)
+    if isinstance(words, dict):
+        for word in words:
+            suffixes.add(word, words[word])
+    elif weighted:
+        for word in words:
+            suffixes.add(word)
+    else:
+        suffixes.extend(words)
+
+
+def corpus_files(sources):
+    """Expand a directory or a list of files/directories, sorted by name."""
+    if isinstance(sources, str):
+        sources = [sources]
+    files = []
+    for source in sources:
+        if os.path.isdir(source):
+            names = sorted(os.listdir(source))
+            for name in names:
+                path = os.path.join(source, name)
+                if os.path.isfile(path):
+                    files.append(path)
+        else:
+            files.append(source)
+    return files
+
+
+def build_table_parallel(table, sources, n, weighted=False, keep_order=False,
+                         workers=None):
+    """Build one table from many files, counting them in worker processes.
+
+    sources is a directory, a filename, or a list of either. The files are
+    treated as one continuous stream in sorted order, exactly as if
+    build_table were run on their concatenation: a single NONWORD start,
+    transitions across file boundaries, and one terminator at the end.
+    """
+    files = corpus_files(sources)
+    counted = weighted and not keep_order
+    jobs = [(filename, n, counted) for filename in files]
+
+    if workers == 1 or len(jobs) <= 1:
+        results = map(_count_file, jobs)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_count_file, jobs)
 
-    # initial prefix
-    prefix_words = []
+    window = []
     i = 0
     while i < n:
-        prefix_words.append(NONWORD)
+        window.append(NONWORD)
         i += 1
 
-    prefix = make_prefix(prefix_words)
+    for head, tail, count, transitions in results:
+        # transitions whose prefix reaches back into earlier files
+        for word in head:
+            add_suffix(table, ' '.join(window), word, weighted, keep_order)
+            window.pop(0)
+            window.append(word)
+        if count > n:
+            window = list(tail)
+
+        for prefix in transitions:
+            _merge_suffixes(table, prefix, transitions[prefix], weighted,
+                            keep_order)
+
+    if executor is not None:
+        executor.shutdown()
+
+    add_suffix(table, ' '.join(window), NONWORD, weighted, keep_order)
+    if weighted:
+        compact_suffixes(table)
+
+
+def iter_text(table, n, max_words, rng=random):
+    """Yield generated words one at a time from a build_table table.
+
+    rng is the random source (the random module or a random.Random), so
+    independent generators can run with independent seeds.
+    """
+    window = deque([NONWORD] * n, maxlen=n)
 
     i = 0
     while i < max_words:
-        suffixes = table.get(prefix)
+        suffixes = table.get(' '.join(window))
         if suffixes is None:
             break
 
-        r = random.randrange(len(suffixes))
-        word = suffixes[r]
+        word = choose_suffix(suffixes, rng)
 
         if word == NONWORD:
             break
 
-        result.append(word)
+        yield word
+        window.append(word)
+        i += 1
 
-        # shift prefix
-        j = 0
-        while j < n - 1:
-            prefix_words[j] = prefix_words[j + 1]
-            j += 1
-        prefix_words[n - 1] = word
-        prefix = make_prefix(prefix_words)
 
+def iter_text_ids(table, n, max_words, pool, rng=random):
+    """Like iter_text, for build_table_ids tables and MappedModels."""
+    window = PrefixWindow(n)
+
+    i = 0
+    while i < max_words:
+        suffixes = table.get(window.key(), window.hash)
+        if suffixes is None:
+            break
+
+        word_id = choose_suffix(suffixes, rng)
+        if word_id == 0:
+            break
+
+        yield pool.word(word_id)
+        window.shift(word_id)
         i += 1
 
-    return result
 
+def generate_text(table, n, max_words):
+    return list(iter_text(table, n, max_words))
 
-def print_words(words):
-    count = 0
+
+def generate_text_ids(table, n, max_words, pool):
+    """Generate text from a table built by build_table_ids."""
+    return list(iter_text_ids(table, n, max_words, pool))
+
+
+def iter_lines(words, per_line=10):
+    """Group an iterable of words into lines of per_line words."""
     line_words = []
+    for word in words:
+        line_words.append(word)
+        if len(line_words) == per_line:
+            yield ' '.join(line_words)
+            line_words = []
+    if line_words:
+        yield ' '.join(line_words)
+
+
+class PrefixNode:
+    """One context in a VariableOrderModel trie.
+
+    children is keyed by the word one step further back in the history,
+    and suffixes counts the words that followed this context.
+    """
+
+    def __init__(self, keep_order=False):
+        self.children = {}
+        self.suffixes = SuffixCounts(keep_order)
+
+
+class VariableOrderModel:
+    """Markov model of every order 0..n_max in one shared trie.
+
+    The trie is keyed by the history read backwards (last word first), so
+    the order-k context of a position is the depth-k node on the same path
+    as its order-(k+1) context; one pass over the text fills all orders.
+    With keep_order=True the order-n nodes sample exactly like a
+    build_table table of prefix size n.
+    """
+
+    def __init__(self, n_max, keep_order=False):
+        self.n_max = n_max
+        self._keep_order = keep_order
+        self.root = PrefixNode(keep_order)
+
+    def add_document(self, source):
+        """Count one file or string of text, with its own start and end."""
+        history = deque([NONWORD] * self.n_max, maxlen=self.n_max)
+        for word in _document_words(source):
+            self._record(history, word)
+            history.append(word)
+        self._record(history, NONWORD)
+
+    def _record(self, history, word):
+        node = self.root
+        node.suffixes.add(word)
+        for previous in reversed(history):
+            child = node.children.get(previous)
+            if child is None:
+                child = PrefixNode(self._keep_order)
+                node.children[previous] = child
+            child.suffixes.add(word)
+            node = child
+
+    def compact(self):
+        """Release the build-time indexes of every node's SuffixCounts."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node.suffixes.compact()
+            stack.extend(node.children.values())
+
+    def suffixes_for(self, history, order):
+        """Suffixes of the longest known context of at most order words."""
+        node = self.root
+        depth = 0
+        for previous in reversed(history):
+            if depth == order:
+                break
+            child = node.children.get(previous)
+            if child is None:
+                break
+            node = child
+            depth += 1
+        return node.suffixes
+
+
+def build_variable_order(filename, n_max, keep_order=False):
+    """Build a VariableOrderModel for orders up to n_max in one pass."""
+    model = VariableOrderModel(n_max, keep_order)
+    model.add_document(filename)
+    model.compact()
+    return model
+
+
+def iter_text_backoff(model, order, max_words, rng=random):
+    """Yield words using the longest context (up to order) that was seen.
+
+    When the current order-word prefix never occurred, generation backs
+    off to successively shorter prefixes, down to plain word frequencies.
+    """
+    history = deque([NONWORD] * model.n_max, maxlen=model.n_max)
 
     i = 0
-    while i < len(words):
-        line_words.append(words[i])
-        count += 1
+    while i < max_words:
+        suffixes = model.suffixes_for(history, order)
+        if suffixes.total == 0:
+            break
 
-        if count == 10:
-            line = ''
-            j = 0
-            while j < len(line_words):
-                if j > 0:
-                    line = line + ' '
-                line = line + line_words[j]
-                j += 1
-            print(line)
-            line_words = []
-            count = 0
+        word = suffixes.sample(rng)
+        if word == NONWORD:
+            break
 
+        yield word
+        history.append(word)
         i += 1
 
-    if count > 0:
-        line = ''
-        j = 0
-        while j < len(line_words):
-            if j > 0:
-                line = line + ' '
-            line = line + line_words[j]
-            j += 1
+
+_batch_source = None
+
+
+def _init_batch_worker(table, n, max_words, pool):
+    global _batch_source
+    _batch_source = (table, n, max_words, pool)
+
+
+def _batch_text(seed):
+    """Worker for generate_batch: one formatted text for one seed."""
+    table, n, max_words, pool = _batch_source
+    rng = random.Random(seed)
+    if pool is None:
+        words = iter_text(table, n, max_words, rng)
+    else:
+        words = iter_text_ids(table, n, max_words, pool, rng)
+    lines = []
+    for line in iter_lines(words):
+        lines.append(line + '\n')
+    return ''.join(lines)
+
+
+def generate_batch(table, n, max_words, seeds, out, pool=None,
+                   workers=None, block=64):
+    """Write one independent text per seed to the file object out.
+
+    Each text uses its own random.Random(seed), so a seed always gives the
+    same text whatever the batch size or worker count. Texts are written
+    ten words per line, in seed order, followed by a blank line. Pass
+    pool for build_table_ids tables or a MappedModel (as table and pool).
+    With workers > 1 the texts are generated in a process pool that gets
+    the table once per worker, at most block texts at a time. Each text
+    reaches out as a single write, so out's own buffering does the rest.
+    """
+    if workers is None or workers <= 1:
+        _init_batch_worker(table, n, max_words, pool)
+        for seed in seeds:
+            out.write(_batch_text(seed) + '\n')
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_batch_worker,
+            initargs=(table, n, max_words, pool))
+        seeds = list(seeds)
+        start = 0
+        while start < len(seeds):
+            texts = executor.map(_batch_text, seeds[start:start + block])
+            for text in texts:
+                out.write(text + '\n')
+            start += block
+        executor.shutdown()
+    out.flush()
+
+
+MODEL_MAGIC = b'WBM1'
+
+
+def save_model(table, n, filename, pool=None):
+    """Write a finished prefix→suffix table to a compact binary file.
+
+    table may come from build_table (string keys, pool=None) or from
+    build_table_ids (tuple keys, pass its pool). The file holds, as
+    little-endian uint32s: a header, a string pool with its offset
+    array, an open-addressed slot array (n key IDs, value start, value
+    length) and the suffix values. Weighted tables store (word ID, count)
+    pairs; plain tables store every suffix occurrence in order, so a
+    loaded model generates the same text for the same seed.
+    """
+    if pool is None:
+        pool = WordPool()
+        string_keys = True
+    else:
+        string_keys = False
+
+    entries = []
+    weighted = 0
+    for key, suffixes in table.items():
+        if string_keys:
+            ids = []
+            for word in key.split(' '):
+                ids.append(pool.id_of(word))
+            key = tuple(ids)
+        if isinstance(suffixes, SuffixCounts):
+            weighted = 1
+            values = list(zip(suffixes.words, suffixes.counts))
+        else:
+            values = list(suffixes)
+        if string_keys:
+            if weighted:
+                values = [(pool.id_of(w), c) for w, c in values]
+            else:
+                values = [pool.id_of(w) for w in values]
+        entries.append((key, values))
+
+    num_slots = 2 * len(entries) + 1
+    width = n + 2
+    slots = array('I', [0]) * (num_slots * width)
+    values_arr = array('I')
+
+    for key, values in entries:
+        index = key_hash(key) % num_slots
+        while slots[index * width + n + 1] != 0:
+            index -= 1
+            if index < 0:
+                index = num_slots - 1
+        base = index * width
+        i = 0
+        while i < n:
+            slots[base + i] = key[i]
+            i += 1
+        slots[base + n] = len(values_arr) // (1 + weighted)
+        slots[base + n + 1] = len(values)
+        for v in values:
+            if weighted:
+                values_arr.append(v[0])
+                values_arr.append(v[1])
+            else:
+                values_arr.append(v)
+
+    pool_bytes = bytearray()
+    offsets = array('I')
+    i = 0
+    while i < len(pool):
+        offsets.append(len(pool_bytes))
+        pool_bytes += pool.word(i).encode('utf-8')
+        i += 1
+    offsets.append(len(pool_bytes))
+    pool_len = len(pool_bytes)
+    while len(pool_bytes) % 4 != 0:
+        pool_bytes.append(0)
+
+    header = array('I', [n, weighted, len(pool), pool_len, num_slots,
+                         len(values_arr), len(entries), 0])
+    if sys.byteorder != 'little':
+        for arr in (header, offsets, slots, values_arr):
+            arr.byteswap()
+
+    f = open(filename, 'wb')
+    f.write(MODEL_MAGIC)
+    header.tofile(f)
+    offsets.tofile(f)
+    f.write(pool_bytes)
+    slots.tofile(f)
+    values_arr.tofile(f)
+    f.close()
+
+
+class MappedModel:
+    """Read-only view of a save_model file, memory-mapped, not parsed.
+
+    get() takes the same tuple-of-word-ID keys as build_table_ids (and the
+    optional PrefixWindow hash), and word() decodes IDs, so a MappedModel
+    can be passed as both table and pool to generate_text_ids. Suffix
+    lists are returned as array copies, so close() is safe at any time.
+    """
+
+    def __init__(self, filename):
+        if sys.byteorder != 'little':
+            raise ValueError('model files are little-endian')
+        self._filename = filename
+        self._u32 = None
+        self._mm = None
+        self._file = open(filename, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0,
+                                 access=mmap.ACCESS_READ)
+        except ValueError:   # an empty file cannot be mapped
+            pass
+        if self._mm is None or self._mm[:4] != MODEL_MAGIC:
+            self.close()
+            raise ValueError(filename + ' is not a writer_bot model')
+        self._u32 = memoryview(self._mm).cast('I')
+
+        u = self._u32
+        self.n = u[1]
+        self.weighted = u[2] == 1
+        self._num_words = u[3]
+        pool_len = u[4]
+        self._num_slots = u[5]
+        self._num_keys = u[7]
+
+        self._offsets = 9
+        self._pool = (self._offsets + self._num_words + 1) * 4
+        self._slots = self._offsets + self._num_words + 1 + (pool_len + 3) // 4
+        self._values = self._slots + self._num_slots * (self.n + 2)
+        self._cache = {}
+
+    def close(self):
+        if self._u32 is not None:
+            self._u32.release()
+            self._u32 = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if not self._file.closed:
+            self._file.close()
+        self._cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __reduce__(self):
+        # worker processes re-map the file instead of copying the model
+        return (MappedModel, (self._filename,))
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self._num_keys
+
+    def word(self, word_id):
+        start = self._u32[self._offsets + word_id]
+        end = self._u32[self._offsets + word_id + 1]
+        return str(self._mm[self._pool + start:self._pool + end], 'utf-8')
+
+    def _find(self, key, h=None):
+        if h is None:
+            h = key_hash(key)
+        n = self.n
+        width = n + 2
+        u = self._u32
+        index = h % self._num_slots
+        count = 0
+        while count < self._num_slots:
+            base = self._slots + index * width
+            if u[base + n + 1] == 0:
+                return -1
+            i = 0
+            while i < n and u[base + i] == key[i]:
+                i += 1
+            if i == n:
+                return base
+            index -= 1
+            if index < 0:
+                index = self._num_slots - 1
+            count += 1
+        return -1
+
+    def get(self, key, h=None):
+        base = self._find(key, h)
+        if base < 0:
+            return None
+        start = self._values + self._u32[base + self.n]
+        length = self._u32[base + self.n + 1]
+        if not self.weighted:
+            suffixes = array('I')
+            suffixes.frombytes(self._mm[4 * start:4 * (start + length)])
+            return suffixes
+
+        suffixes = self._cache.get(base)
+        if suffixes is None:
+            suffixes = SuffixCounts()
+            start = self._values + 2 * self._u32[base + self.n]
+            i = 0
+            while i < length:
+                suffixes.add(self._u32[start + 2 * i],
+                             self._u32[start + 2 * i + 1])
+                i += 1
+            suffixes.compact()
+            self._cache[base] = suffixes
+        return suffixes
+
+    def __contains__(self, key):
+        return self._find(key) >= 0
+
+    def items(self):
+        """Yield (key tuple, suffixes) for every stored prefix."""
+        width = self.n + 2
+        index = 0
+        while index < self._num_slots:
+            base = self._slots + index * width
+            if self._u32[base + self.n + 1] != 0:
+                key = tuple(self._u32[base:base + self.n])
+                yield key, self.get(key)
+            index += 1
+
+    def to_table(self, load_factor=0.75):
+        """Copy the model into a growable Hashtable and WordPool."""
+        pool = WordPool()
+        i = 1
+        while i < self._num_words:
+            pool.id_of(self.word(i))
+            i += 1
+
+        table = Hashtable(2 * self._num_keys + 1, load_factor)
+        for key, suffixes in self.items():
+            if self.weighted:
+                copy = SuffixCounts()
+                j = 0
+                while j < len(suffixes.words):
+                    copy.add(suffixes.words[j], suffixes.counts[j])
+                    j += 1
+                copy.compact()
+            else:
+                copy = list(suffixes)
+            table.put(key, copy)
+        return table, pool
+
+
+def _document_words(source):
+    """Words of source, which is either a filename or the text itself."""
+    if os.path.isfile(source):
+        return read_words(source)
+    return iter(source.split())
+
+
+def update(table, source, n, pool=None, weighted=False, keep_order=False):
+    """Fold one more document into an existing table.
+
+    source is a filename or a string of text. The document gets its own
+    NONWORD start prefix and its own terminator, as if it had been built
+    alone, and only prefixes it touches are visited, so the cost depends
+    on the new text only. Pass pool for build_table_ids tables, and the
+    same weighted/keep_order the table was built with.
+    """
+    words = _document_words(source)
+    if pool is None:
+        window = deque([NONWORD] * n, maxlen=n)
+        for word in words:
+            add_suffix(table, ' '.join(window), word, weighted, keep_order)
+            window.append(word)
+        add_suffix(table, ' '.join(window), NONWORD, weighted, keep_order)
+    else:
+        window = PrefixWindow(n)
+        for word in words:
+            word_id = pool.id_of(word)
+            _add_suffix_id(table, window, word_id, weighted, keep_order)
+            window.shift(word_id)
+        _add_suffix_id(table, window, 0, weighted, keep_order)
+
+
+def update_model(filename, source):
+    """Fold one more document into a save_model file, in place.
+
+    The mapped file cannot grow, so the model is copied into memory,
+    updated and saved again; this costs time in the size of the model.
+    """
+    model = MappedModel(filename)
+    n = model.n
+    weighted = model.weighted
+    table, pool = model.to_table()
+    model.close()
+
+    update(table, source, n, pool, weighted)
+    save_model(table, n, filename, pool)
+
+
+def print_words(words):
+    for line in iter_lines(words):
         print(line)
 
 
@@ -0,0 +1,232 @@
+"""
+File: writer_bot_server.py
+Author: Amy Cardona
+Course: CSC 120, Fall 2025
+Purpose: A long-running asyncio service around writer_bot_ht. It loads
+one or more corpora once, then answers generation requests sent as one
+JSON object per line over a local TCP socket:
+
+    {"corpus": "austen", "n": 2, "length": 100, "seed": 8}
+
+and replies with one JSON line, {"words": [...]} or {"error": "..."}.
+Every request gets its own random.Random(seed), so the same request
+always returns the same text no matter what else is being served, and
+generation runs in an executor so the event loop keeps accepting
+requests. A benchmark client measures latency and throughput.
+
+    python writer_bot_server.py serve 8765 austen=austen.txt --orders 1,2
+    python writer_bot_server.py bench 8765 austen 2 100 --requests 1000
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import writer_bot_ht as wb
+
+HOST = '127.0.0.1'
+
+# (corpus, n) -> (table, pool); set in every process that generates text
+_models = {}
+
+
+def _init_models(models):
+    global _models
+    _models = models
+
+
+def _generate(corpus, n, length, seed):
+    """Generate one text; runs in an executor thread or process."""
+    table, pool = _models[(corpus, n)]
+    rng = random.Random(seed)
+    return list(wb.iter_text_ids(table, n, length, pool, rng))
+
+
+def is_model_file(filename):
+    f = open(filename, 'rb')
+    magic = f.read(4)
+    f.close()
+    return magic == wb.MODEL_MAGIC
+
+
+class TextService:
+    """Holds the loaded tables and serves requests for them."""
+
+    def __init__(self, processes=0):
+        self.models = {}
+        self._processes = processes
+        self._executor = None
+
+    def add_corpus(self, name, filename, orders):
+        """Load a save_model file, or build one table per order."""
+        if is_model_file(filename):
+            model = wb.MappedModel(filename)
+            self.models[(name, model.n)] = (model, model)
+            return
+        for n in orders:
+            pool = wb.WordPool()
+            table = wb.Hashtable(1024, 0.75)
+            wb.build_table_ids(table, filename, n, pool)
+            self.models[(name, n)] = (table, pool)
+
+    def start(self):
+        _init_models(self.models)
+        if self._processes > 0:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._processes, initializer=_init_models,
+                initargs=(self.models,))
+        else:
+            self._executor = ThreadPoolExecutor()
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def check(self, request):
+        """Return (corpus, n, length, seed) or raise ValueError."""
+        if not isinstance(request, dict):
+            raise ValueError('request must be a JSON object')
+        corpus = request.get('corpus')
+        n = request.get('n')
+        length = request.get('length')
+        seed = request.get('seed', wb.SEED)
+        if not isinstance(corpus, str):
+            raise ValueError('corpus must be a string')
+        if not isinstance(n, int) or n < 1:
+            raise ValueError('specified prefix size is less than one')
+        if not isinstance(length, int) or length < 1:
+            raise ValueError('specified size of the generated text is '
+                             'less than one')
+        if isinstance(seed, bool) or not isinstance(seed, (int, str)):
+            raise ValueError('seed must be an integer or a string')
+        if (corpus, n) not in self.models:
+            raise ValueError('no table for corpus ' + str(corpus) +
+                             ' with prefix size ' + str(n))
+        return corpus, n, length, seed
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # the line is over the stream limit; the rest of it can
+                # no longer be told apart from the next request
+                reply = {'error': 'request line is too long'}
+                writer.write((json.dumps(reply) + '\n').encode('utf-8'))
+                await writer.drain()
+                break
+            if not line:
+                break
+            try:
+                args = self.check(json.loads(line))
+                words = await loop.run_in_executor(self._executor,
+                                                   _generate, *args)
+                reply = {'words': words}
+            except ValueError as e:
+                reply = {'error': str(e)}
+            writer.write((json.dumps(reply) + '\n').encode('utf-8'))
+            await writer.drain()
+        writer.close()
+        await writer.wait_closed()
+
+    async def serve(self, port, host=HOST):
+        self.start()
+        server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.stop()
+
+
+async def _client(port, request, count, latencies, host):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    while i < count:
+        request['seed'] = random.randrange(1 << 30)
+        start = time.perf_counter()
+        writer.write((json.dumps(request) + '\n').encode('utf-8'))
+        await writer.drain()
+        reply = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        i += 1
+    writer.close()
+    await writer.wait_closed()
+
+
+async def benchmark(port, corpus, n, length, requests, concurrency,
+                    host=HOST):
+    """Send requests over concurrency connections; print latency stats."""
+    latencies = []
+    request = {'corpus': corpus, 'n': n, 'length': length}
+    start = time.perf_counter()
+    clients = []
+    i = 0
+    while i < concurrency:
+        # the first requests % concurrency clients send one extra
+        count = requests // concurrency
+        if i < requests % concurrency:
+            count += 1
+        if count > 0:
+            clients.append(_client(port, dict(request), count, latencies,
+                                   host))
+        i += 1
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies)
+    if total == 0:
+        print('no requests sent')
+        return
+    print(str(total) + ' requests in ' + str(round(elapsed, 3)) + ' s: ' +
+          str(round(total / elapsed, 1)) + ' req/s')
+    print('latency ms: p50 ' +
+          str(round(1000 * latencies[total // 2], 2)) + ', p95 ' +
+          str(round(1000 * latencies[int(total * 0.95)], 2)) + ', max ' +
+          str(round(1000 * latencies[-1], 2)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='writer_bot text service')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve = commands.add_parser('serve')
+    serve.add_argument('port', type=int)
+    serve.add_argument('corpora', nargs='+', help='name=file')
+    serve.add_argument('--orders', default='1,2,3')
+    serve.add_argument('--processes', type=int, default=0)
+
+    bench = commands.add_parser('bench')
+    bench.add_argument('port', type=int)
+    bench.add_argument('corpus')
+    bench.add_argument('n', type=int)
+    bench.add_argument('length', type=int)
+    bench.add_argument('--requests', type=int, default=1000)
+    bench.add_argument('--concurrency', type=int, default=16)
+
+    args = parser.parse_args()
+    if args.command == 'serve':
+        orders = [int(k) for k in args.orders.split(',')]
+        service = TextService(args.processes)
+        for spec in args.corpora:
+            name, sep, filename = spec.partition('=')
+            if sep == '':
+                print('ERROR: corpus must be given as name=file: ' + spec)
+                sys.exit(0)
+            service.add_corpus(name, filename, orders)
+        asyncio.run(service.serve(args.port))
+    else:
+        asyncio.run(benchmark(args.port, args.corpus, args.n, args.length,
+                              args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()